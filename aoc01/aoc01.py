@@ -1,37 +1,137 @@
-from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+import heapq
+import os
+import sys
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+from aoc_input import DEFAULT_FILENAME, cached_lines, map_bytes
 
+CHUNK_SIZE = 64 * 1024 * 1024
 
-def fill_elves(input_lines: list[str]) -> dict[int, str]:
-    elves = defaultdict(list)
-    start_line = 0
-    for i, line in enumerate(input_lines):
+
+def push_elf(heap: list[int], calories: int, k: int):
+    """Keeps the k largest calorie sums seen so far in a min-heap"""
+    if len(heap) < k:
+        heapq.heappush(heap, calories)
+    elif calories > heap[0]:
+        heapq.heapreplace(heap, calories)
+
+
+def top_elves(input_lines: Iterable[str], k: int = 3) -> tuple[int, list[int]]:
+    """Sums up the calories of every elf in one pass over the lines.
+
+    Only the running sum of the current elf and a heap of the k largest
+    sums are kept, so memory stays O(k) regardless of the input size.
+
+    Args:
+        input_lines (Iterable[str]): calorie lines, elves separated by blank lines
+        k (int): number of top elves to keep
+
+    Returns:
+        tuple[int, list[int]]: the maximum and the top k sums, largest first
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    heap: list[int] = []
+    current = 0
+    has_items = False
+    for line in input_lines:
         if not line:
-            start_line = i + 1
+            if has_items:
+                push_elf(heap, current, k)
+            current = 0
+            has_items = False
             continue
-        elves[start_line].append(int(line))
-    return elves
+        current += int(line)
+        has_items = True
+    if has_items:
+        push_elf(heap, current, k)
+    top = sorted(heap, reverse=True)
+    return (top[0] if top else 0), top
+
+
+def split_chunks(filename: str, chunk_size: int) -> list[tuple[int, int]]:
+    """Splits a file into byte ranges of roughly chunk_size bytes.
+
+    Every range ends right after a blank line, so no elf is ever cut in
+    half by a chunk boundary.
+
+    Args:
+        filename (str): path of the calorie list
+        chunk_size (int): approximate size of a chunk in bytes
+
+    Returns:
+        list[tuple[int, int]]: start and end offsets of the chunks
+    """
+    chunks: list[tuple[int, int]] = []
+    with map_bytes(filename) as data:
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n\n", start + chunk_size)
+            end = len(data) if end == -1 else end + 2
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def top_elves_in_chunk(filename: str, chunk: tuple[int, int], k: int) -> list[int]:
+    start, end = chunk
+    with map_bytes(filename) as data:
+        text = data[start:end].decode("utf-8")
+    _, top = top_elves((line.strip() for line in text.split("\n")), k)
+    return top
+
+
+def top_elves_parallel(
+    filename: str = DEFAULT_FILENAME,
+    k: int = 3,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[int, list[int]]:
+    """Same as top_elves, but parses the chunks of a file in a process pool.
+
+    Every worker returns the top k of its chunk, those are merged into
+    the overall top k afterwards.
+
+    Args:
+        filename (str): path of the calorie list
+        k (int): number of top elves to keep
+        workers (int | None): number of processes, defaults to the CPU count
+        chunk_size (int): approximate size of a chunk in bytes
+
+    Returns:
+        tuple[int, list[int]]: the maximum and the top k sums, largest first
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    chunks = split_chunks(filename, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = pool.map(top_elves_in_chunk, repeat(filename), chunks, repeat(k))
+        top = heapq.nlargest(k, (value for result in results for value in result))
+    return (top[0] if top else 0), top
 
 
-def task1():
-    input_lines = get_input()
-    elves = fill_elves(input_lines)
-    return max(sum(elf) for elf in elves.values())
+def task1(parallel: bool = False):
+    if parallel:
+        maximum, _ = top_elves_parallel(k=1)
+    else:
+        maximum, _ = top_elves(cached_lines(), k=1)
+    return maximum
 
 
-def task2():
-    input_lines = get_input()
-    elves = fill_elves(input_lines)
-    backpacks = sorted(list(sum(elf) for elf in elves.values()), reverse=True)
-    return sum(backpacks[:3])
+def task2(parallel: bool = False):
+    if parallel:
+        _, top = top_elves_parallel(k=3)
+    else:
+        _, top = top_elves(cached_lines(), k=3)
+    return sum(top)
 
 
-print(task1())
-print(task2())
+if __name__ == "__main__":
+    parallel = "--parallel" in sys.argv[1:]
+    print(task1(parallel))
+    print(task2(parallel))
@@ -1,5 +1,13 @@
 from dataclasses import dataclass
 from enum import Enum, auto
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from aoc_input import DEFAULT_FILENAME, map_bytes
 
 
 class Hand(Enum):
@@ -64,14 +72,6 @@ def translate_outcome(symbol: str):
             "Z": win}[symbol]
 
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
-
-
 def get_score(other: Hand, mine: Hand) -> int:
     if mine.defeats == other.hand:
         return 6 + mine.hand.value
@@ -82,23 +82,55 @@ def get_score(other: Hand, mine: Hand) -> int:
     return 3 + mine.hand.value
 
 
+OTHER_SYMBOLS = "ABC"
+MY_SYMBOLS = "XYZ"
+
+
+def score_tables() -> tuple[np.ndarray, np.ndarray]:
+    """Precomputes the score of all 9 possible rounds for both tasks.
+
+    The tables are indexed with 3 * other + mine, where other is the
+    position of the symbol in "ABC" and mine the one in "XYZ".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: score tables for task 1 and task 2
+    """
+    table1 = np.zeros(9, dtype=np.int64)
+    table2 = np.zeros(9, dtype=np.int64)
+    for i, other_symbol in enumerate(OTHER_SYMBOLS):
+        for j, my_symbol in enumerate(MY_SYMBOLS):
+            other = translate_symbol(other_symbol)
+            table1[3 * i + j] = get_score(other, translate_symbol(my_symbol))
+            table2[3 * i + j] = get_score(other, translate_outcome(my_symbol)(other))
+    return table1, table2
+
+
+SCORE_TABLE1, SCORE_TABLE2 = score_tables()
+
+
+def count_rounds(data: bytes) -> np.ndarray:
+    """Counts how often each of the 9 possible rounds occurs in the raw input"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    others = raw[(raw >= ord("A")) & (raw <= ord("C"))].astype(np.intp) - ord("A")
+    mine = raw[(raw >= ord("X")) & (raw <= ord("Z"))].astype(np.intp) - ord("X")
+    return np.bincount(3 * others + mine, minlength=9)
+
+
+def get_scores(filename: str = DEFAULT_FILENAME) -> tuple[int, int]:
+    """Scores a whole strategy guide for both tasks in one pass over its bytes"""
+    with map_bytes(filename) as data:
+        counts = count_rounds(data)
+    return int(counts @ SCORE_TABLE1), int(counts @ SCORE_TABLE2)
+
+
 def task1():
-    score = 0
-    for line in get_input():
-        other, mine = (translate_symbol(symbol) for symbol in line.split())
-        score += get_score(other, mine)
-    return score
+    return get_scores()[0]
 
 
 def task2():
-    score = 0
-    for line in get_input():
-        other, outcome = line.split()
-        other = translate_symbol(other)
-        mine = translate_outcome(outcome)(other)
-        score += get_score(other, mine)
-    return score
+    return get_scores()[1]
 
 
-print(task1())
-print(task2())
+score1, score2 = get_scores()
+print(score1)
+print(score2)
@@ -1,15 +1,10 @@
+from collections.abc import Iterable
+from pathlib import Path
+import sys
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
-
-
-for line in get_input():
-    assert len(line) % 2 == 0
+from aoc_input import iter_lines
 
 
 def priority(letter: str) -> int:
@@ -19,30 +14,60 @@ def priority(letter: str) -> int:
     return letter_code - 64 + 26
 
 
+# Bit (priority - 1) stands for an item, so a mask fits in 52 bits.
+ITEM_BITS = {chr(code): 1 << (priority(chr(code)) - 1)
+             for code in (*range(ord("a"), ord("z") + 1), *range(ord("A"), ord("Z") + 1))}
+
+
+def item_mask(items: str) -> int:
+    mask = 0
+    for item in items:
+        mask |= ITEM_BITS[item]
+    return mask
+
+
+def mask_priority(mask: int) -> int:
+    """Priority of the single item in a mask"""
+    assert mask and mask & (mask - 1) == 0
+    return mask.bit_length()
+
+
+def rucksack_priorities(lines: Iterable[str]) -> tuple[int, int]:
+    """Computes the results of both tasks in one pass over the rucksacks.
+
+    Every compartment and rucksack is encoded as a bit mask, so the common
+    items are found with & and the badge of each group of three rucksacks
+    is found on the fly.
+
+    Args:
+        lines (Iterable[str]): one rucksack per line
+
+    Returns:
+        tuple[int, int]: sum of the misplaced items and sum of the badges
+    """
+    result1 = 0
+    result2 = 0
+    group = -1
+    for i, line in enumerate(lines):
+        assert len(line) % 2 == 0
+        half = len(line) // 2
+        first, second = item_mask(line[:half]), item_mask(line[half:])
+        result1 += mask_priority(first & second)
+        group &= first | second
+        if i % 3 == 2:
+            result2 += mask_priority(group)
+            group = -1
+    return result1, result2
+
+
 def task1() -> int:
-    result = 0
-    lines = get_input()
-    for line in lines:
-        first, second = line[:len(line)//2], line[len(line)//2:]
-        first_set, second_set = set(first), set(second)
-        overlap = first_set & second_set
-        assert len(overlap) == 1
-        result += priority(overlap.pop())
-    return result
+    return rucksack_priorities(iter_lines())[0]
 
 
 def task2() -> int:
-    result = 0
-    lines = get_input()
-    for i in range(0, len(lines), 3):
-        first = set(lines[i])
-        second = set(lines[i+1])
-        third = set(lines[i+2])
-        overlap = first & second & third
-        assert len(overlap) == 1
-        result += priority(overlap.pop())
-    return result
-
-
-print(task1())
-print(task2())
+    return rucksack_priorities(iter_lines())[1]
+
+
+result1, result2 = rucksack_priorities(iter_lines())
+print(result1)
+print(result2)
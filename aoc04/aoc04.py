@@ -1,39 +1,169 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+import re
+import sys
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def get_ranges(line: str) -> tuple[set[int], set[int]]:
+from aoc_input import DEFAULT_FILENAME, cached_lines, read_text
+
+
+NUMBER_PATTERN = re.compile(R"\d+")
+
+
+def get_ranges(line: str) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Parses a pair of assignments into inclusive (start, end) intervals"""
     def1, def2 = line.split(",")
     def1, def2 = (d.split("-") for d in (def1, def2))
-    range1 = set(range(int(def1[0]), int(def1[1])+1))
-    range2 = set(range(int(def2[0]), int(def2[1])+1))
+    range1 = (int(def1[0]), int(def1[1]))
+    range2 = (int(def2[0]), int(def2[1]))
     return range1, range2
 
 
+def contains(range1: tuple[int, int], range2: tuple[int, int]) -> bool:
+    """Shows if one of the intervals fully contains the other one"""
+    return (range1[0] <= range2[0] and range2[1] <= range1[1]) or (
+        range2[0] <= range1[0] and range1[1] <= range2[1]
+    )
+
+
+def overlaps(range1: tuple[int, int], range2: tuple[int, int]) -> bool:
+    return range1[0] <= range2[1] and range2[0] <= range1[1]
+
+
+def get_range_array(filename: str = DEFAULT_FILENAME) -> np.ndarray:
+    """Parses all pairs of a file into an array with one row per pair.
+
+    The columns are start1, end1, start2 and end2.
+    """
+    numbers = NUMBER_PATTERN.findall(read_text(filename))
+    return np.array(numbers, dtype=np.int64).reshape(-1, 4)
+
+
+def count_pairs(ranges: np.ndarray) -> tuple[int, int]:
+    """Counts the fully containing and the overlapping pairs of an array
+    created by get_range_array
+
+    Returns:
+        tuple[int, int]: number of containing and number of overlapping pairs
+    """
+    start1, end1, start2, end2 = ranges.T
+    contained = ((start1 <= start2) & (end2 <= end1)) | ((start2 <= start1) & (end1 <= end2))
+    overlapping = (start1 <= end2) & (start2 <= end1)
+    return int(contained.sum()), int(overlapping.sum())
+
+
+@dataclass
+class IntervalNode:
+    center: int
+    by_start: list[int]
+    by_end: list[int]
+    left: Self | None
+    right: Self | None
+
+
+class IntervalIndex:
+    """Centered interval tree over section assignments.
+
+    Queries return the positions of the matching assignments in the list
+    the index was built from.
+    """
+
+    def __init__(self, assignments: list[tuple[int, int]]) -> None:
+        self.assignments = assignments
+        self.order = sorted(range(len(assignments)), key=lambda i: assignments[i][0])
+        self.starts = [assignments[i][0] for i in self.order]
+        self.sorted_ends = sorted(end for _, end in assignments)
+        self.root = self.build(list(range(len(assignments))))
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> Self:
+        """Builds an index over both assignments of every line"""
+        return cls([assignment for line in lines for assignment in get_ranges(line)])
+
+    def build(self, ids: list[int]) -> IntervalNode | None:
+        if not ids:
+            return None
+        endpoints = sorted(value for i in ids for value in self.assignments[i])
+        center = endpoints[len(endpoints) // 2]
+        left = [i for i in ids if self.assignments[i][1] < center]
+        right = [i for i in ids if self.assignments[i][0] > center]
+        here = [i for i in ids if self.assignments[i][0] <= center <= self.assignments[i][1]]
+        return IntervalNode(
+            center=center,
+            by_start=sorted(here, key=lambda i: self.assignments[i][0]),
+            by_end=sorted(here, key=lambda i: self.assignments[i][1], reverse=True),
+            left=self.build(left),
+            right=self.build(right),
+        )
+
+    def stab(self, point: int) -> list[int]:
+        """Finds all assignments containing a section in O(log n + k)"""
+        result: list[int] = []
+        node = self.root
+        while node:
+            if point < node.center:
+                for i in node.by_start:
+                    if self.assignments[i][0] > point:
+                        break
+                    result.append(i)
+                node = node.left
+            elif point > node.center:
+                for i in node.by_end:
+                    if self.assignments[i][1] < point:
+                        break
+                    result.append(i)
+                node = node.right
+            else:
+                result.extend(node.by_start)
+                break
+        return result
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """Finds all assignments overlapping the sections start to end in O(log n + k)
+
+        These are the ones containing start plus the ones beginning after
+        start but not after end.
+        """
+        first = bisect_right(self.starts, start)
+        last = bisect_right(self.starts, end)
+        return self.stab(start) + self.order[first:last]
+
+    def count_overlapping_pairs(self) -> int:
+        """Counts all pairs of overlapping assignments in O(n log n).
+
+        For every assignment, the ones starting before its end overlap it,
+        unless they also end before its start.
+        """
+        total = 0
+        for start, end in self.assignments:
+            total += bisect_right(self.starts, end) - bisect_left(self.sorted_ends, start) - 1
+        return total // 2
+
+
 def task1() -> int:
     result = 0
-    for line in get_input():
+    for line in cached_lines():
         range1, range2 = get_ranges(line)
-        overlap = range1.intersection(range2)
-        if overlap == range1 or overlap == range2:
+        if contains(range1, range2):
             result += 1
     return result
 
 
 def task2() -> int:
     result = 0
-    for line in get_input():
+    for line in cached_lines():
         range1, range2 = get_ranges(line)
-        overlap = range1.intersection(range2)
-        if overlap:
+        if overlaps(range1, range2):
             result += 1
     return result
 
 
-print(task1())
-print(task2())
+result1, result2 = count_pairs(get_range_array())
+print(result1)
+print(result2)
@@ -1,27 +1,19 @@
+from array import array
 from collections import deque, defaultdict
-from dataclasses import dataclass
+from collections.abc import Iterable
+from pathlib import Path
 import re
+import sys
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-COMMAND_PATTERN = re.compile(R"^move (\d+) from (\d+) to (\d+)$")
+from aoc_input import DEFAULT_FILENAME, read_text
 
 
-@dataclass
-class Command:
-    amount: int
-    source: int
-    target: int
+COMMAND_PATTERN = re.compile(R"^move (\d+) from (\d+) to (\d+)$", re.MULTILINE)
 
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
-
-
-def get_stacks(input_lines: list[str]) -> dict[int, list]:
+def get_stacks(input_lines: Iterable[str]) -> dict[int, list]:
     stacks: dict[int, deque] = defaultdict(deque)
     for line in input_lines:
         if not "[" in line:
@@ -35,43 +27,59 @@ def get_stacks(input_lines: list[str]) -> dict[int, list]:
     return stacks
 
 
-def parse_command(line: str) -> Command | None:
-    if match := re.match(COMMAND_PATTERN, line):
-        return Command(*(int(group) for group in match.groups()))
-    return None
+def parse_input(filename: str = DEFAULT_FILENAME) -> tuple[dict[int, list], array]:
+    """Parses the drawing and all commands of the input at once.
 
+    Returns:
+        tuple[dict[int, list], array]: the stacks and a flat array of
+            (amount, source, target) triples
+    """
+    text = read_text(filename)
+    drawing, _, commands = text.partition("\n\n")
+    stacks = get_stacks(drawing.splitlines())
+    triples = array("l", (int(value) for command in COMMAND_PATTERN.findall(commands)
+                          for value in command))
+    return stacks, triples
 
-def move1(stacks: dict[int, list], command: Command):
-    for i in range(command.amount):
-        stacks[command.target].append(stacks[command.source].pop())
 
+def move1(stacks: dict[int, list], amount: int, source: int, target: int):
+    """Moves crates one at a time, so they end up in reversed order.
 
-def move2(stacks: dict[int, list], command: Command):
-    crates_to_move = stacks[command.source][-command.amount:]
-    stacks[command.target].extend(crates_to_move)
-    stacks[command.source] = stacks[command.source][:-command.amount]
+    Only the moved tail of the source stack is touched, which costs O(k).
+    """
+    if not amount:
+        return
+    source_stack = stacks[source]
+    stacks[target].extend(reversed(source_stack[-amount:]))
+    del source_stack[-amount:]
 
 
-def task1() -> str:
-    input_lines = get_input()
-    stacks = get_stacks(input_lines)
-    for line in input_lines:
-        command = parse_command(line)
-        if not command:
-            continue
-        move1(stacks, command)
+def move2(stacks: dict[int, list], amount: int, source: int, target: int):
+    """Moves crates all at once, so they keep their order, in O(k)"""
+    if not amount:
+        return
+    source_stack = stacks[source]
+    stacks[target].extend(source_stack[-amount:])
+    del source_stack[-amount:]
+
+
+def replay(stacks: dict[int, list], commands: array, move) -> str:
+    """Runs all commands on a copy of the stacks and reads the top crates"""
+    stacks = {key: list(value) for key, value in stacks.items()}
+    for i in range(0, len(commands), 3):
+        move(stacks, commands[i], commands[i + 1], commands[i + 2])
     return "".join(stacks[key][-1] for key in sorted(stacks))
 
 
+stacks, commands = parse_input()
+
+
+def task1() -> str:
+    return replay(stacks, commands, move1)
+
+
 def task2() -> str:
-    input_lines = get_input()
-    stacks = get_stacks(input_lines)
-    for line in input_lines:
-        command = parse_command(line)
-        if not command:
-            continue
-        move2(stacks, command)
-    return "".join(stacks[key][-1] for key in sorted(stacks))
+    return replay(stacks, commands, move2)
 
 
 print(task1())
@@ -1,43 +1,95 @@
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+import sys
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from aoc_input import DEFAULT_FILENAME
 
-def is_marker(stream: str, position: int, length: int) -> bool:
-    """Shows if the 4 characters at a given positon are a marker, 
-    meaning all different
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MarkerWindow:
+    """Sliding window over the last `length` bytes of a data stream,
+    keeping a count per byte value and the number of distinct bytes"""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.counts = [0] * 256
+        self.distinct = 0
+
+    def push(self, byte: int):
+        if self.counts[byte] == 0:
+            self.distinct += 1
+        self.counts[byte] += 1
+
+    def pop(self, byte: int):
+        self.counts[byte] -= 1
+        if self.counts[byte] == 0:
+            self.distinct -= 1
+
+    def is_marker(self) -> bool:
+        return self.distinct == self.length
+
+
+def find_markers(
+    source: Any, lengths: Iterable[int], chunk_size: int = CHUNK_SIZE
+) -> dict[int, int | None]:
+    """Finds the first marker for every window length in one pass.
+
+    The stream is read in chunks from a file-like object with read() or
+    a socket-like object with recv(), so it never has to fit in memory.
+    A line break ends the data stream.
 
     Args:
-        stream (str): the data stream
-        position (int): position in the data stream
+        source (Any): binary file or socket-like object
+        lengths (Iterable[int]): marker lengths, e.g. 4 and 14
+        chunk_size (int): number of bytes to read at once
 
     Returns:
-        bool: marker or not
+        dict[int, int | None]: for every length, the number of bytes read
+            until the end of the first marker, None if there is no marker
     """
-    if position > len(stream) - length:
-        return False
-    return len(set(stream[position:position+length])) == length
+    read = getattr(source, "read", None) or source.recv
+    windows = [MarkerWindow(length) for length in sorted(set(lengths))]
+    markers: dict[int, int | None] = {window.length: None for window in windows}
+    history = bytearray(max(markers, default=1))
+    position = 0
+    while windows and (chunk := read(chunk_size)):
+        for byte in chunk:
+            if byte == ord("\n"):
+                return markers
+            for window in windows:
+                if position >= window.length:
+                    window.pop(history[(position - window.length) % len(history)])
+                window.push(byte)
+            history[position % len(history)] = byte
+            position += 1
+            if any(window.is_marker() for window in windows):
+                for window in windows:
+                    if window.is_marker():
+                        markers[window.length] = position
+                windows = [window for window in windows if markers[window.length] is None]
+                if not windows:
+                    break
+    return markers
+
+
+def get_markers(filename: str = DEFAULT_FILENAME) -> dict[int, int | None]:
+    with open(filename, "rb") as file:
+        return find_markers(file, (4, 14))
 
 
 def task1():
-    stream = get_input()[0]
-    length = 4
-    for i in range(len(stream)):
-        if is_marker(stream, i, length):
-            return i + length
+    return get_markers()[4]
 
 
 def task2():
-    stream = get_input()[0]
-    length = 14
-    for i in range(len(stream)):
-        if is_marker(stream, i, length):
-            return i + length
+    return get_markers()[14]
 
 
-print(task1())
-print(task2())
+markers = get_markers()
+print(markers[4])
+print(markers[14])
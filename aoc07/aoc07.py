@@ -1,15 +1,17 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from itertools import accumulate
 from typing import Self, Any
 from pathlib import PurePosixPath as Path
+import pathlib
+import sys
 
 from dataclasses import dataclass
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+from aoc_input import iter_lines
 
 
 @dataclass
@@ -24,55 +26,174 @@ class Directory:
     name: str
     parent: Self | None
     children: list[Self | File]
-
-    @property
-    def size(self) -> int:
-        return sum(child.size for child in self.children)
-
-
-def build_tree(input_lines: list[str]) -> dict[Path, Directory]:
+    size: int = 0
+
+    def add_size(self, size: int):
+        """Adds the size of a new file to this directory and all its parents"""
+        directory = self
+        while directory:
+            directory.size += size
+            directory = directory.parent
+
+
+def apply_line(dirs: dict[Path, Directory], current_path: Path, line: str) -> Path:
+    """Applies one line of the terminal log to the tree.
+
+    Directory sizes are updated on the fly, so a tree can be kept up to
+    date while the log is still growing.
+
+    Returns:
+        Path: the current path after the line
+    """
+    match line.split():
+        case ["$", "ls"]:
+            pass
+        case ["$", "cd", "/"]:
+            current_path = Path("/")
+        case ["$", "cd", ".."]:
+            current_path = current_path.parent
+        case ["$", "cd", name]:
+            current_path = current_path / name
+        case ["dir", name]:
+            path = (current_path / name).as_posix()
+            dirs[current_path].children.append(
+                dir := Directory(path, parent=dirs[current_path], children=[])
+            )
+            dirs[current_path/name] = dir
+        case [number, name]:
+            path = (current_path / name).as_posix()
+            size = int(number)
+            dirs[current_path].children.append(
+                File(path, size, parent=dirs[current_path])
+            )
+            dirs[current_path].add_size(size)
+    return current_path
+
+
+def build_tree(input_lines: Iterable[str]) -> dict[Path, Directory]:
     dirs = {Path("/"): Directory("/", None, [])}
     current_path: Path = Path("/")
     for line in input_lines:
+        current_path = apply_line(dirs, current_path, line)
+    return dirs
+
+
+class CompactTree:
+    """Array-backed alternative to the Directory/File tree.
+
+    Every entry is an index into flat arrays holding the parent index,
+    an interned name id, the size and a directory flag. The root has
+    index 0, and every entry has a larger index than its parent.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = ["/"]
+        self.name_ids: dict[str, int] = {"/": 0}
+        self.parents = array("q", [-1])
+        self.name_of = array("q", [0])
+        self.sizes = array("q", [0])
+        self.is_dir = bytearray(b"\x01")
+        self.subdirs: dict[tuple[int, int], int] = {}
+
+    @classmethod
+    def from_lines(cls, input_lines: Iterable[str]) -> Self:
+        tree = cls()
+        current = 0
+        for line in input_lines:
+            current = tree.apply_line(current, line)
+        tree.sum_sizes()
+        return tree
+
+    def intern(self, name: str) -> int:
+        if (name_id := self.name_ids.get(name)) is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def add_entry(self, parent: int, name: str, size: int, is_dir: bool) -> int:
+        self.parents.append(parent)
+        self.name_of.append(self.intern(name))
+        self.sizes.append(size)
+        self.is_dir.append(is_dir)
+        return len(self.parents) - 1
+
+    def subdir(self, parent: int, name: str) -> int:
+        key = (parent, self.intern(name))
+        if (index := self.subdirs.get(key)) is None:
+            index = self.subdirs[key] = self.add_entry(parent, name, 0, True)
+        return index
+
+    def apply_line(self, current: int, line: str) -> int:
+        """Applies one line of the terminal log, returns the current directory"""
         match line.split():
             case ["$", "ls"]:
-                continue
+                pass
             case ["$", "cd", "/"]:
-                current_path = Path("/")
+                current = 0
             case ["$", "cd", ".."]:
-                current_path = current_path.parent
+                current = max(self.parents[current], 0)
             case ["$", "cd", name]:
-                current_path = current_path / name
+                current = self.subdir(current, name)
             case ["dir", name]:
-                path = (current_path / name).as_posix()
-                dirs[current_path].children.append(
-                    dir := Directory(path, parent=dirs[current_path], children=[])
-                )
-                dirs[current_path/name] = dir
+                self.subdir(current, name)
             case [number, name]:
-                path = (current_path / name).as_posix()
-                size = int(number)
-                dirs[current_path].children.append(
-                    File(path, size, parent=dirs[current_path])
-                )
-    return dirs
+                self.add_entry(current, name, int(number), False)
+        return current
+
+    def sum_sizes(self):
+        """Adds up all directory sizes bottom-up in one pass.
 
+        Children always come after their parent, so walking the entries
+        backwards sees every directory complete before adding it to its parent.
+        """
+        for index in range(len(self.parents) - 1, 0, -1):
+            self.sizes[self.parents[index]] += self.sizes[index]
 
-dirs = build_tree(get_input())
+    def directory_sizes(self) -> list[int]:
+        return [size for size, is_dir in zip(self.sizes, self.is_dir) if is_dir]
 
 
-def task1():
-    return sum(dir.size for dir in dirs.values() if dir.size <= 100000)
+class SizeIndex:
+    """Sorted directory sizes with prefix sums for threshold queries"""
 
+    def __init__(self, sizes: Iterable[int]) -> None:
+        self.sizes = sorted(sizes)
+        self.prefix_sums = list(accumulate(self.sizes, initial=0))
 
-def task2():
+    def total_at_most(self, limit: int) -> int:
+        """Sum of all directory sizes of at most limit, in O(log n)"""
+        return self.prefix_sums[bisect_right(self.sizes, limit)]
+
+    def smallest_at_least(self, limit: int) -> int | None:
+        """Smallest directory size of at least limit, in O(log n)"""
+        index = bisect_left(self.sizes, limit)
+        if index == len(self.sizes):
+            return None
+        return self.sizes[index]
+
+
+def task1(index: SizeIndex) -> int:
+    return index.total_at_most(100000)
+
+
+def task2(index: SizeIndex, root_size: int) -> int:
     total = 70_000_000
     required = 30_000_000
-    free = total - dirs[Path("/")].size
-    large_enough_dirs = sorted([dir for dir in dirs.values(
-    ) if dir.size + free >= required], key=lambda x: x.size)
-    return large_enough_dirs[0].size
+    free = total - root_size
+    size = index.smallest_at_least(required - free)
+    if size is None:
+        raise ValueError(f"No directory frees the {required - free} bytes still needed")
+    return size
+
+
+if "--compact" in sys.argv[1:]:
+    tree = CompactTree.from_lines(iter_lines())
+    sizes, root_size = tree.directory_sizes(), tree.sizes[0]
+else:
+    dirs = build_tree(iter_lines())
+    sizes, root_size = [dir.size for dir in dirs.values()], dirs[Path("/")].size
+index = SizeIndex(sizes)
 
 
-print(task1())
-print(task2())
+print(task1(index))
+print(task2(index, root_size))
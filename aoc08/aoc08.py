@@ -1,81 +1,312 @@
+from collections.abc import Sequence
+from pathlib import Path
+from tempfile import TemporaryFile
+from typing import Any
+import sys
 
-def get_input() -> list[list[int]]:
-    input_lines: list[list[int]] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append([int(char) for char in line.strip()])
-    return input_lines
-
-
-def is_visible(i: int, j: int, grid: list[list[int]]) -> bool:
-    height = grid[i][j]
-    largest_up = max([grid[y][j] for y in range(i)]+[-1])
-    largest_down = max([grid[y][j] for y in range(i+1, len(grid))]+[-1])
-    largest_left = max([grid[i][x] for x in range(j)]+[-1])
-    largest_right = max([grid[i][x] for x in range(j+1, len(grid[i]))]+[-1])
-    return height > largest_up or height > largest_down or height > largest_left or height > largest_right
-
-
-def scenic_score(i: int, j: int, grid: list[list[int]]) -> int:
-    score = 1
-    height = grid[i][j]
-    distance = 0
-    for y in range(i-1, -1, -1):
-        distance += 1
-        if grid[y][j] >= height:
-            break
-    score *= distance
-    distance = 0
-    for y in range(i+1, len(grid)):
-        distance += 1
-        if grid[y][j] >= height:
-            break
-    score *= distance
-    distance = 0
-    for x in range(j-1, -1, -1):
-        distance += 1
-        if grid[i][x] >= height:
-            break
-    score *= distance
-    distance = 0
-    for x in range(j+1, len(grid[i])):
-        distance += 1
-        if grid[i][x] >= height:
-            break
-    score *= distance
-    return score
-
-
-grid = [
-    [3, 0, 3, 7, 3],
-    [2, 5, 5, 1, 2],
-    [6, 5, 3, 3, 2],
-    [3, 3, 5, 4, 9],
-    [3, 5, 3, 9, 0],
-]
-
-grid = get_input()
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aoc_input import DEFAULT_FILENAME, map_bytes
+
+
+def parse_heights(data: bytes) -> np.ndarray:
+    """Turns the raw bytes of a height map into a uint8 grid"""
+    end = data.find(b"\n")
+    width = len(bytes(data[:end if end != -1 else len(data)]).strip())
+    raw = np.frombuffer(data, dtype=np.uint8)
+    digits = raw[(raw >= ord("0")) & (raw <= ord("9"))]
+    return (digits - ord("0")).reshape(-1, width)
+
+
+def get_heights(filename: str = DEFAULT_FILENAME) -> np.ndarray:
+    with map_bytes(filename) as data:
+        return parse_heights(data)
+
+
+def largest_before(heights: np.ndarray, axis: int) -> np.ndarray:
+    """Running maximum of the trees before each tree along an axis,
+    -1 at the edge"""
+    running = np.maximum.accumulate(heights.astype(np.int16), axis=axis)
+    before = np.full_like(running, -1)
+    if axis == 0:
+        before[1:] = running[:-1]
+    else:
+        before[:, 1:] = running[:, :-1]
+    return before
+
+
+def visibility(heights: np.ndarray) -> tuple[int, np.ndarray]:
+    """Computes which trees are visible from outside the grid.
+
+    Every direction is one running maximum sweep, so the whole grid
+    costs O(n²) instead of O(n) per tree.
+
+    Args:
+        heights (np.ndarray): uint8 grid of tree heights
+
+    Returns:
+        tuple[int, np.ndarray]: number of visible trees and the boolean mask
+    """
+    up = largest_before(heights, axis=0)
+    down = largest_before(heights[::-1], axis=0)[::-1]
+    left = largest_before(heights, axis=1)
+    right = largest_before(heights[:, ::-1], axis=1)[:, ::-1]
+    mask = (heights > up) | (heights > down) | (heights > left) | (heights > right)
+    return int(mask.sum()), mask
+
+
+class SightLine:
+    """Monotonic stack of the trees seen so far along one line of sight.
+
+    The heights on the stack are strictly decreasing, so it never holds
+    more than 10 trees, and every tree is pushed and popped at most once.
+    """
+
+    def __init__(self) -> None:
+        self.stack: list[tuple[int, int]] = []
+
+    def look(self, position: int, height: int) -> int:
+        """Adds the next tree and returns how far it can look back"""
+        stack = self.stack
+        while stack and stack[-1][1] < height:
+            stack.pop()
+        distance = position - stack[-1][0] if stack else position
+        if stack and stack[-1][1] == height:
+            stack.pop()
+        stack.append((position, height))
+        return distance
+
+
+def line_distances(line: Sequence[int]) -> list[int]:
+    """Viewing distances of all trees of a line towards its start"""
+    sight = SightLine()
+    return [sight.look(position, height) for position, height in enumerate(line)]
+
+
+def scenic_scores(heights: np.ndarray) -> tuple[np.ndarray, tuple[int, int]]:
+    """Computes the scenic score of every tree in O(n²) total.
+
+    Returns:
+        tuple[np.ndarray, tuple[int, int]]: the score grid and the position
+            of the highest score
+    """
+    rows = heights.tolist()
+    columns = heights.T.tolist()
+    scores = np.array([line_distances(row) for row in rows], dtype=np.int64)
+    scores *= np.array([line_distances(row[::-1])[::-1] for row in rows])
+    scores *= np.array([line_distances(column) for column in columns]).T
+    scores *= np.array([line_distances(column[::-1])[::-1] for column in columns]).T
+    best = np.unravel_index(np.argmax(scores), scores.shape)
+    return scores, (int(best[0]), int(best[1]))
+
+
+def read_band(raw: np.ndarray, stride: int, width: int, start: int, rows: int) -> list[list[int]]:
+    """Reads rows of heights from the raw bytes of a height map"""
+    chunk = raw[start * stride:(start + rows) * stride]
+    padded = np.zeros(-(-len(chunk) // stride) * stride, dtype=np.uint8)
+    padded[:len(chunk)] = chunk
+    return (padded.reshape(-1, stride)[:, :width] - ord("0")).tolist()
+
+
+def scenic_scores_banded(
+    filename: str = DEFAULT_FILENAME, band_rows: int = 1024, output: Any = None
+) -> tuple[np.memmap, tuple[int, int]]:
+    """Same as scenic_scores, for height maps that do not fit in memory.
+
+    The height map is memory-mapped and processed in bands of rows. The
+    column stacks are carried from band to band, first top-down and then
+    bottom-up, and the scores are written to a memory-mapped file.
+
+    Args:
+        filename (str): height map with one row per line
+        band_rows (int): number of rows held in memory at once
+        output (Any): file to hold the scores, a temporary file by default
+
+    Returns:
+        tuple[np.memmap, tuple[int, int]]: the score grid and the position
+            of the highest score
+    """
+    with open(filename, "rb") as file:
+        first_line = file.readline()
+    # Rows are a fixed number of bytes apart, including the line break
+    # with an optional carriage return; the last row may lack it.
+    stride = len(first_line)
+    width = len(first_line.rstrip(b"\r\n"))
+    raw = np.memmap(filename, dtype=np.uint8, mode="r")
+    height = -(-len(raw) // stride)
+    scores = np.memmap(output or TemporaryFile(), dtype=np.int64, mode="w+", shape=(height, width))
+
+    up = [SightLine() for _ in range(width)]
+    for start in range(0, height, band_rows):
+        band = read_band(raw, stride, width, start, band_rows)
+        rows = []
+        for i, row in enumerate(band, start):
+            left = line_distances(row)
+            right = line_distances(row[::-1])[::-1]
+            rows.append([left[j] * right[j] * up[j].look(i, h) for j, h in enumerate(row)])
+        scores[start:start + len(band)] = rows
+
+    best_score = -1
+    best = (0, 0)
+    down = [SightLine() for _ in range(width)]
+    for start in range(((height - 1) // band_rows) * band_rows, -1, -band_rows):
+        band = read_band(raw, stride, width, start, band_rows)
+        distances = [[]] * len(band)
+        for offset in range(len(band) - 1, -1, -1):
+            position = height - 1 - (start + offset)
+            distances[offset] = [down[j].look(position, h) for j, h in enumerate(band[offset])]
+        block = scores[start:start + len(band)]
+        block *= np.array(distances, dtype=np.int64)
+        index = int(np.argmax(block))
+        if block.flat[index] > best_score:
+            best_score = int(block.flat[index])
+            best = (start + index // width, index % width)
+    scores.flush()
+    return scores, best
+
+
+class MaxTree:
+    """Segment tree of maxima over a fixed number of values"""
+
+    def __init__(self, values: Sequence[int]) -> None:
+        self.length = len(values)
+        self.size = 1
+        while self.size < self.length:
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + self.length] = values
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def update(self, position: int, value: int):
+        node = position + self.size
+        self.tree[node] = value
+        while node > 1:
+            node //= 2
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def max(self, start: int, end: int) -> int:
+        """Largest value in [start, end), -1 if empty"""
+        result = -1
+        start += self.size
+        end += self.size
+        while start < end:
+            if start % 2:
+                result = max(result, self.tree[start])
+                start += 1
+            if end % 2:
+                end -= 1
+                result = max(result, self.tree[end])
+            start //= 2
+            end //= 2
+        return result
+
+    def last_at_least(self, end: int, value: int, node: int = 1, lo: int = 0, hi: int = -1) -> int:
+        """Last position before end holding at least value, -1 if none"""
+        if hi == -1:
+            hi = self.size
+        if lo >= end or self.tree[node] < value:
+            return -1
+        if hi - lo == 1:
+            return lo
+        mid = (lo + hi) // 2
+        found = self.last_at_least(end, value, 2 * node + 1, mid, hi)
+        if found == -1:
+            found = self.last_at_least(end, value, 2 * node, lo, mid)
+        return found
+
+    def first_at_least(self, start: int, value: int, node: int = 1, lo: int = 0, hi: int = -1) -> int:
+        """First position from start on holding at least value, length if none"""
+        if hi == -1:
+            hi = self.size
+        if hi <= start or self.tree[node] < value:
+            return self.length
+        if hi - lo == 1:
+            return lo
+        mid = (lo + hi) // 2
+        found = self.first_at_least(start, value, 2 * node, lo, mid)
+        if found == self.length:
+            found = self.first_at_least(start, value, 2 * node + 1, mid, hi)
+        return found
+
+
+class Forest:
+    """Tree heights that can change, with live visibility and scenic scores.
+
+    Every row and column has a segment tree of maxima, so the visibility
+    and the scenic score of a single tree are O(log n) queries. Changing
+    a height only refreshes the trees in its row and column, and the best
+    scenic score is kept in another segment tree over all scores.
+    """
+
+    def __init__(self, heights: np.ndarray) -> None:
+        self.height, self.width = heights.shape
+        self.heights: list[list[int]] = heights.tolist()
+        self.rows = [MaxTree(row) for row in self.heights]
+        self.columns = [MaxTree(column) for column in heights.T.tolist()]
+        self.visible_count, mask = visibility(heights)
+        self.visible: list[list[bool]] = mask.tolist()
+        scores, _ = scenic_scores(heights)
+        self.scores = MaxTree(scores.ravel().tolist())
+
+    def is_visible(self, i: int, j: int) -> bool:
+        height = self.heights[i][j]
+        row, column = self.rows[i], self.columns[j]
+        return (height > row.max(0, j) or height > row.max(j + 1, self.width)
+                or height > column.max(0, i) or height > column.max(i + 1, self.height))
+
+    def scenic_score(self, i: int, j: int) -> int:
+        height = self.heights[i][j]
+        row, column = self.rows[i], self.columns[j]
+        left = j - max(row.last_at_least(j, height), 0)
+        right = min(row.first_at_least(j + 1, height), self.width - 1) - j
+        up = i - max(column.last_at_least(i, height), 0)
+        down = min(column.first_at_least(i + 1, height), self.height - 1) - i
+        return left * right * up * down
+
+    def refresh(self, i: int, j: int):
+        visible = self.is_visible(i, j)
+        self.visible_count += visible - self.visible[i][j]
+        self.visible[i][j] = visible
+        self.scores.update(i * self.width + j, self.scenic_score(i, j))
+
+    def set_height(self, i: int, j: int, height: int):
+        """Changes one tree and refreshes its row and column in O(n log n)"""
+        self.heights[i][j] = height
+        self.rows[i].update(j, height)
+        self.columns[j].update(i, height)
+        for x in range(self.width):
+            self.refresh(i, x)
+        for y in range(self.height):
+            if y != i:
+                self.refresh(y, j)
+
+    def score(self, i: int, j: int) -> int:
+        return self.scores.tree[self.scores.size + i * self.width + j]
+
+    @property
+    def best_score(self) -> int:
+        return self.scores.tree[1]
+
+    @property
+    def best_position(self) -> tuple[int, int]:
+        return divmod(self.scores.first_at_least(0, self.best_score), self.width)
+
+
+forest = Forest(get_heights())
 
 
 def task1():
-    result = 0
-    for i, line in enumerate(grid):
-        for j, tree in enumerate(line):
-            if is_visible(i, j, grid):
-                result += 1
-    return result
+    return forest.visible_count
 
 
 def task2():
-    result = 0
-    for i, line in enumerate(grid):
-        for j, tree in enumerate(line):
-            if (score := scenic_score(i, j, grid)) > result:
-                result = score
-    return result
+    return forest.best_score
 
 
 print(task1())
 
-print(scenic_score(3, 2, grid))
+print(forest.score(3, 2))
 print(task2())
@@ -0,0 +1,110 @@
+import random
+
+import numpy as np
+
+from aoc08 import Forest, scenic_scores, scenic_scores_banded, visibility
+
+
+SAMPLE = [
+    [3, 0, 3, 7, 3],
+    [2, 5, 5, 1, 2],
+    [6, 5, 3, 3, 2],
+    [3, 3, 5, 4, 9],
+    [3, 5, 3, 9, 0],
+]
+
+
+def brute_force_is_visible(i: int, j: int, grid: list[list[int]]) -> bool:
+    height = grid[i][j]
+    column = [row[j] for row in grid]
+    return (all(tree < height for tree in grid[i][:j]) or all(tree < height for tree in grid[i][j + 1:])
+            or all(tree < height for tree in column[:i]) or all(tree < height for tree in column[i + 1:]))
+
+
+def brute_force_scenic_score(i: int, j: int, grid: list[list[int]]) -> int:
+    score = 1
+    height = grid[i][j]
+    for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        distance = 0
+        y, x = i + di, j + dj
+        while 0 <= y < len(grid) and 0 <= x < len(grid[0]):
+            distance += 1
+            if grid[y][x] >= height:
+                break
+            y, x = y + di, x + dj
+        score *= distance
+    return score
+
+
+def random_grid(rng: random.Random) -> list[list[int]]:
+    width = rng.randint(1, 8)
+    return [[rng.randint(0, 9) for _ in range(width)] for _ in range(rng.randint(1, 8))]
+
+
+def write_grid(path, grid: list[list[int]], newline: str = "\n", final_newline: bool = True):
+    text = newline.join("".join(str(height) for height in row) for row in grid)
+    path.write_bytes((text + (newline if final_newline else "")).encode())
+
+
+def test_scenic_scores_match_brute_force():
+    rng = random.Random(0)
+    for grid in [SAMPLE] + [random_grid(rng) for _ in range(100)]:
+        scores, best = scenic_scores(np.array(grid, dtype=np.uint8))
+        expected = [[brute_force_scenic_score(i, j, grid) for j in range(len(grid[0]))]
+                    for i in range(len(grid))]
+        assert scores.tolist() == expected
+        assert scores[best] == max(max(row) for row in expected)
+
+
+def test_visibility_matches_brute_force():
+    rng = random.Random(2)
+    for grid in [SAMPLE] + [random_grid(rng) for _ in range(100)]:
+        count, mask = visibility(np.array(grid, dtype=np.uint8))
+        expected = [[brute_force_is_visible(i, j, grid) for j in range(len(grid[0]))]
+                    for i in range(len(grid))]
+        assert mask.tolist() == expected
+        assert count == sum(map(sum, expected))
+
+
+def test_forest_updates_match_brute_force():
+    rng = random.Random(3)
+    for _ in range(30):
+        grid = random_grid(rng)
+        forest = Forest(np.array(grid, dtype=np.uint8))
+        for _ in range(10):
+            i, j = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            grid[i][j] = rng.randint(0, 9)
+            forest.set_height(i, j, grid[i][j])
+            visible = [[brute_force_is_visible(y, x, grid) for x in range(len(grid[0]))]
+                       for y in range(len(grid))]
+            scores = [[brute_force_scenic_score(y, x, grid) for x in range(len(grid[0]))]
+                      for y in range(len(grid))]
+            assert forest.visible == visible
+            assert forest.visible_count == sum(map(sum, visible))
+            assert forest.best_score == max(map(max, scores))
+            y, x = forest.best_position
+            assert scores[y][x] == forest.best_score
+            assert all(forest.score(y, x) == scores[y][x]
+                       for y in range(len(grid)) for x in range(len(grid[0])))
+
+
+def test_banded_scores_match_in_memory(tmp_path):
+    rng = random.Random(1)
+    path = tmp_path / "heights.txt"
+    for grid in [SAMPLE] + [random_grid(rng) for _ in range(50)]:
+        expected, _ = scenic_scores(np.array(grid, dtype=np.uint8))
+        for newline in ("\n", "\r\n"):
+            for final_newline in (True, False):
+                write_grid(path, grid, newline, final_newline)
+                for band_rows in (1, 2, 3, 100):
+                    scores, best = scenic_scores_banded(str(path), band_rows)
+                    assert np.array_equal(scores, expected)
+                    assert scores[best] == expected.max()
+
+
+def test_banded_sample_without_final_newline(tmp_path):
+    path = tmp_path / "heights.txt"
+    write_grid(path, SAMPLE, final_newline=False)
+    scores, best = scenic_scores_banded(str(path))
+    assert scores.shape == (5, 5)
+    assert best == (3, 2)
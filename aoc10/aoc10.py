@@ -1,56 +1,136 @@
-from typing import Self, Any
-from pathlib import PurePosixPath as Path
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
 
-from dataclasses import dataclass
+import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+from aoc_input import iter_lines
+
+
+NOOP = 0
+ADDX = 1
+CYCLES = {NOOP: 1, ADDX: 2}
+SCREEN_WIDTH = 40
+
+
+def compile_program(input_lines: Iterable[str]) -> array:
+    """Compiles the instructions into a flat array of (opcode, operand) pairs"""
+    program = array("l")
+    for line in input_lines:
+        match line.split():
+            case ["noop"]:
+                program.extend((NOOP, 0))
+            case ["addx", value]:
+                program.extend((ADDX, int(value)))
+    return program
+
+
+def count_cycles(program: array) -> int:
+    return sum(CYCLES[opcode] for opcode in program[::2])
 
 
 @dataclass
 class Processor:
-    result2: list[str]
+    framebuffer: bytearray = field(default_factory=bytearray)
     x: int = 1
     cycle: int = 0
     result1: int = 0
-    line: str = ""
-
-    def increase_cycle(self):
-        raster_pos = self.cycle % 40
-        if raster_pos == 0:
-            self.result2.append(self.line)
-            self.line = ""
-        self.cycle += 1
-        if abs(raster_pos - self.x) < 2:
-            self.line += "#"
-        else:
-            self.line += "."
-        if (self.cycle - 20) % 40 == 0:
-            self.result1 += self.cycle * self.x
-
-    def noop(self):
-        self.increase_cycle()
-
-    def addx(self, value: int):
-        self.increase_cycle()
-        self.increase_cycle()
-        self.x += value
-
-
-proc = Processor(result2=[])
-for line in get_input():
-    match line.split():
-        case ["noop"]:
-            proc.noop()
-        case ["addx", value]:
-            proc.addx(int(value))
-
-print(proc.result1)
-for line in proc.result2:
+
+    def run(self, program: array):
+        """Executes a compiled program into a framebuffer allocated up front"""
+        start = len(self.framebuffer)
+        self.framebuffer.extend(b"." * count_cycles(program))
+        framebuffer = self.framebuffer
+        x = self.x
+        cycle = self.cycle
+        result1 = self.result1
+        for i in range(0, len(program), 2):
+            for _ in range(CYCLES[program[i]]):
+                if abs(cycle % SCREEN_WIDTH - x) < 2:
+                    framebuffer[start + cycle - self.cycle] = ord("#")
+                cycle += 1
+                if (cycle - 20) % SCREEN_WIDTH == 0:
+                    result1 += cycle * x
+            if program[i] == ADDX:
+                x += program[i + 1]
+        self.x = x
+        self.cycle = cycle
+        self.result1 = result1
+
+    @property
+    def rows(self) -> list[str]:
+        screen = self.framebuffer.decode("ascii")
+        return [screen[i:i + SCREEN_WIDTH] for i in range(0, len(screen), SCREEN_WIDTH)]
+
+
+def run_programs(programs: Iterable[array]) -> list[Processor]:
+    """Runs every compiled program on its own processor"""
+    processors = []
+    for program in programs:
+        processor = Processor()
+        processor.run(program)
+        processors.append(processor)
+    return processors
+
+
+class Timeline:
+    """Value of the X register during every cycle of a compiled program.
+
+    The timeline is built with a prefix sum over the addx operands placed
+    at the last cycle of their instruction, so no cycle is stepped
+    through in Python. Cycles are counted from 1, CRT positions from 0.
+    """
+
+    def __init__(self, program: array) -> None:
+        instructions = np.frombuffer(program, dtype=np.dtype(program.typecode)).reshape(-1, 2)
+        opcodes, operands = instructions[:, 0], instructions[:, 1]
+        lengths = np.where(opcodes == ADDX, CYCLES[ADDX], CYCLES[NOOP])
+        ends = np.cumsum(lengths) - 1
+        deltas = np.zeros(int(lengths.sum()) + 1, dtype=np.int64)
+        deltas[ends + 1] = np.where(opcodes == ADDX, operands, 0)
+        self.x = 1 + np.cumsum(deltas)[:-1]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def check_cycles(self, cycles: np.ndarray):
+        if cycles.size and (cycles.min() < 1 or cycles.max() > len(self.x)):
+            raise IndexError(f"Cycles must be between 1 and {len(self.x)}")
+
+    def x_at(self, cycle: int) -> int:
+        if not 1 <= cycle <= len(self.x):
+            raise IndexError(f"Cycle {cycle} is not between 1 and {len(self.x)}")
+        return int(self.x[cycle - 1])
+
+    def signal_strength(self, cycle: int) -> int:
+        return cycle * self.x_at(cycle)
+
+    def signal_sum(self, cycles: Iterable[int]) -> int:
+        cycles = np.fromiter(cycles, dtype=np.int64)
+        self.check_cycles(cycles)
+        return int((cycles * self.x[cycles - 1]).sum())
+
+    def pixel(self, position: int) -> bool:
+        """Shows if the CRT draws a lit pixel at a position"""
+        if not 0 <= position < len(self.x):
+            raise IndexError(f"Position {position} is not between 0 and {len(self.x) - 1}")
+        return abs(position % SCREEN_WIDTH - self.x_at(position + 1)) < 2
+
+    def pixels(self) -> np.ndarray:
+        positions = np.arange(len(self.x))
+        return np.abs(positions % SCREEN_WIDTH - self.x) < 2
+
+
+program = compile_program(iter_lines())
+timeline = Timeline(program)
+proc = Processor()
+proc.run(program)
+
+print(timeline.signal_sum(range(20, len(timeline) + 1, SCREEN_WIDTH)))
+print()
+for line in proc.rows:
     print(line)
-print(proc.line)
@@ -1,122 +1,346 @@
-from dataclasses import dataclass
-from typing import Self
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from pathlib import Path
+import heapq
+import sys
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def get_input() -> list[str]:
-    input_lines: list[str] = []
-    with open("input.txt", "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+from aoc_input import cached_lines, map_bytes
 
 
-class Node:
-    map: dict[tuple[int, int], Self] = {}
-    start_position: tuple[int, int] = (0, 0)
-    end_position: tuple[int, int] = (0, 0)
-    dimensions: tuple[int, int] = (0, 0)
+UNREACHABLE = 999999999
 
-    @classmethod
-    def clear_map(cls):
-        cls.map = {}
 
-    @classmethod
-    def register_map(cls, input_lines: list[list[str]]):
-        x = 0
-        y = 0
+def letter_height(letter: str) -> int:
+    if letter == "S":
+        return 1
+    if letter == "E":
+        return 26
+    return ord(letter) - 96
+
+
+class HeightMap:
+    """Immutable graph of a heightmap.
+
+    Cells are numbered y * width + x. The heights are stored as bytes and
+    the edges in compressed sparse row form: the neighbors of a cell are
+    targets[offsets[cell]:offsets[cell + 1]]. The reverse edges are kept
+    the same way, so searches can run backwards. Searches keep all their
+    state to themselves, so one map can serve many of them at once.
+    """
+
+    def __init__(self, input_lines: Iterable[str]) -> None:
+        heights = bytearray()
+        self.width = 0
+        self.height = 0
+        self.start = 0
+        self.end = 0
         for y, line in enumerate(input_lines):
+            self.width = len(line)
+            self.height = y + 1
             for x, letter in enumerate(line):
-                cls.map[(x, y)] = cls(x, y, letter)
-        cls.dimensions = (x + 1, y + 1)
-        for node in cls.map.values():
-            node.register_neighbors()
-
-    def __init__(self, x: int, y: int, letter: str):
-        self.x: int = x
-        self.y: int = y
-        self.predecessor: Node | None = None
-        self.distance_to_start: int = 999999999
-        self.processed: bool = False
-        self.value: int
-        self.edges: list[tuple[int, Self]] = []
-        if letter == "S":
-            Node.start_position = (x, y)
-            self.value = 1
-            self.distance_to_start = 0
-        elif letter == "E":
-            Node.end_position = (x, y)
-            self.value = 26
-        else:
-            self.value = ord(letter) - 96
-
-    def try_register_neighbor(self, x: int, y: int):
-        if neighbor := self.map.get((x, y), None):
-            edge_cost = neighbor.value - self.value
-            if edge_cost < 0:
-                edge_cost = 0
-            if neighbor.value in (0, 99) or self.value in (0, 99):
-                edge_cost = 0
-            if edge_cost <= 1:
-                self.edges.append((1, neighbor))
-
-    def register_neighbors(self):
-        self.try_register_neighbor(self.x, self.y - 1)
-        self.try_register_neighbor(self.x, self.y + 1)
-        self.try_register_neighbor(self.x - 1, self.y)
-        self.try_register_neighbor(self.x + 1, self.y)
-
-    def __repr__(self) -> str:
-        return f"({self.x}, {self.y}) Value {self.value}, dist {self.distance_to_start}"
+                if letter == "S":
+                    self.start = len(heights)
+                elif letter == "E":
+                    self.end = len(heights)
+                heights.append(letter_height(letter))
+        self.heights = bytes(heights)
+        self.offsets, self.targets = self.build_edges(reverse=False)
+        self.reverse_offsets, self.reverse_targets = self.build_edges(reverse=True)
+
+    def index(self, position: tuple[int, int]) -> int:
+        x, y = position
+        return y * self.width + x
+
+    def position(self, index: int) -> tuple[int, int]:
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def __len__(self) -> int:
+        return len(self.heights)
+
+    def cell_neighbors(self, index: int) -> Iterable[int]:
+        x = index % self.width
+        if index >= self.width:
+            yield index - self.width
+        if index + self.width < len(self.heights):
+            yield index + self.width
+        if x > 0:
+            yield index - 1
+        if x < self.width - 1:
+            yield index + 1
+
+    def can_climb(self, source: int, target: int) -> bool:
+        return self.heights[target] - self.heights[source] <= 1
+
+    def build_edges(self, reverse: bool) -> tuple[memoryview, memoryview]:
+        offsets = array("l", [0])
+        targets = array("l")
+        for index in range(len(self.heights)):
+            for neighbor in self.cell_neighbors(index):
+                if (self.can_climb(neighbor, index) if reverse
+                        else self.can_climb(index, neighbor)):
+                    targets.append(neighbor)
+            offsets.append(len(targets))
+        return memoryview(offsets).toreadonly(), memoryview(targets).toreadonly()
+
+    def edges(self, index: int, reverse: bool = False) -> memoryview:
+        if reverse:
+            return self.reverse_targets[self.reverse_offsets[index]:self.reverse_offsets[index + 1]]
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+
+def bfs(graph: HeightMap, start: int, reverse: bool = False) -> list[int]:
+    """Breadth-first search, enough as long as every edge costs 1.
+
+    With reverse, the edges are followed backwards, so the result is the
+    distance from every cell to the start cell instead.
+
+    Returns:
+        list[int]: distance from the start for every cell,
+            UNREACHABLE if there is no path
+    """
+    distances = [UNREACHABLE] * len(graph)
+    distances[start] = 0
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        distance = distances[index] + 1
+        for neighbor in graph.edges(index, reverse):
+            if distances[neighbor] == UNREACHABLE:
+                distances[neighbor] = distance
+                queue.append(neighbor)
+    return distances
 
 
 def dijkstra(
-    graph: dict[tuple[int, int], Node],
-    start_position: tuple[int, int],
-):
-    start_node: Node = graph[*start_position]
-    start_node.distance_to_start = 0
-    queue: list[Node] = [
-        start_node,
-    ]
-    counter = 0
+    graph: HeightMap,
+    start: int,
+    edge_cost: Callable[[int, int], int] = lambda source, target: 1,
+) -> list[int]:
+    """Dijkstra with a binary heap, for weighted variants of the map.
+
+    Returns:
+        list[int]: distance from the start for every cell,
+            UNREACHABLE if there is no path
+    """
+    distances = [UNREACHABLE] * len(graph)
+    processed = bytearray(len(graph))
+    distances[start] = 0
+    queue: list[tuple[int, int]] = [(0, start)]
     while queue:
-        counter += 1
-        node_to_process = min(queue, key=lambda node: node.distance_to_start)
-        queue.remove(node_to_process)
-        for edge_cost, edge_node in sorted(node_to_process.edges, key=lambda x: x[0]):
-            if edge_node.processed:
+        distance, index = heapq.heappop(queue)
+        if processed[index]:
+            continue
+        processed[index] = True
+        for neighbor in graph.edges(index):
+            new_cost = distance + edge_cost(index, neighbor)
+            if new_cost < distances[neighbor]:
+                distances[neighbor] = new_cost
+                heapq.heappush(queue, (new_cost, neighbor))
+    return distances
+
+
+PAIR_BYTES = 64
+
+
+class PathQueries:
+    """Answers many shortest path queries against one heightmap.
+
+    Full distance fields per source and results of single pairs are kept
+    in an LRU cache limited by their estimated memory. A source that is
+    queried again with another target gets a full distance field, so
+    further queries from it are lookups. New pairs are searched with A*,
+    using landmark distances (ALT) as lower bounds.
+    """
+
+    def __init__(self, graph: HeightMap, max_bytes: int = 64 * 1024 * 1024, landmarks: int = 4) -> None:
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.cache: OrderedDict[tuple[int, int | None], array | int] = OrderedDict()
+        self.pair_targets: dict[int, set[int]] = {}
+        self.landmarks: list[tuple[array, array]] = []
+        self.choose_landmarks(landmarks)
+
+    def choose_landmarks(self, count: int):
+        """Picks landmarks far away from each other, starting at cell 0.
+
+        Stores the distances from and to every landmark.
+        """
+        landmark = 0
+        closest = [UNREACHABLE] * len(self.graph)
+        for _ in range(min(count, len(self.graph))):
+            from_landmark = array("l", bfs(self.graph, landmark))
+            to_landmark = array("l", bfs(self.graph, landmark, reverse=True))
+            self.landmarks.append((from_landmark, to_landmark))
+            closest = [min(a, b) for a, b in zip(closest, from_landmark)]
+            reachable = [(distance, index) for index, distance in enumerate(closest) if distance != UNREACHABLE]
+            if not reachable:
+                break
+            landmark = max(reachable)[1]
+
+    def lower_bound(self, index: int, target: int) -> int:
+        """ALT lower bound of the distance from index to target"""
+        bound = 0
+        for from_landmark, to_landmark in self.landmarks:
+            if to_landmark[index] != UNREACHABLE and to_landmark[target] != UNREACHABLE:
+                bound = max(bound, to_landmark[index] - to_landmark[target])
+            if from_landmark[target] != UNREACHABLE and from_landmark[index] != UNREACHABLE:
+                bound = max(bound, from_landmark[target] - from_landmark[index])
+        return bound
+
+    def entry_size(self, key: tuple[int, int | None], value: array | int) -> int:
+        if key[1] is None:
+            return value.itemsize * len(value)
+        return PAIR_BYTES
+
+    def drop(self, key: tuple[int, int | None]):
+        value = self.cache.pop(key)
+        self.used_bytes -= self.entry_size(key, value)
+        if key[1] is not None:
+            targets = self.pair_targets[key[0]]
+            targets.discard(key[1])
+            if not targets:
+                del self.pair_targets[key[0]]
+
+    def store(self, key: tuple[int, int | None], value: array | int):
+        self.cache[key] = value
+        self.used_bytes += self.entry_size(key, value)
+        if key[1] is not None:
+            self.pair_targets.setdefault(key[0], set()).add(key[1])
+        while self.used_bytes > self.max_bytes and len(self.cache) > 1:
+            self.drop(next(iter(self.cache)))
+
+    def distances_from(self, source: int) -> array:
+        """Full distance field of a source, from the cache if possible.
+
+        Single pair results of the source are dropped once the field is
+        cached, as the field answers them as well.
+        """
+        key = (source, None)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        field = array("l", bfs(self.graph, source))
+        for target in list(self.pair_targets.get(source, ())):
+            self.drop((source, target))
+        self.store(key, field)
+        return field
+
+    def distance(self, source: int, target: int) -> int:
+        key = (source, target)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        if (source, None) in self.cache or source in self.pair_targets:
+            return self.distances_from(source)[target]
+        distance = self.a_star(source, target)
+        self.store(key, distance)
+        return distance
+
+    def a_star(self, source: int, target: int) -> int:
+        distances = {source: 0}
+        queue = [(self.lower_bound(source, target), source)]
+        while queue:
+            _, index = heapq.heappop(queue)
+            if index == target:
+                return distances[index]
+            distance = distances[index] + 1
+            for neighbor in self.graph.edges(index):
+                if distance < distances.get(neighbor, UNREACHABLE):
+                    distances[neighbor] = distance
+                    heapq.heappush(queue, (distance + self.lower_bound(neighbor, target), neighbor))
+        return UNREACHABLE
+
+
+BYTE_HEIGHTS = bytes(
+    letter_height(chr(code)) if chr(code) in "SE" or ord("a") <= code <= ord("z") else 0
+    for code in range(256)
+)
+
+
+class MappedHeightMap:
+    """Heightmap read straight from the raw bytes of the input file.
+
+    Cells are the byte offsets of their letters, so nothing is copied and
+    the neighbor rules are checked on the fly. The line breaks have a
+    height of 0 and are never entered.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.stride = data.find(b"\n") + 1 or len(data) + 1
+        self.start = data.find(b"S")
+        self.end = data.find(b"E")
+
+    def neighbors(self, offset: int, reverse: bool = False) -> Iterable[int]:
+        data = self.data
+        height = BYTE_HEIGHTS[data[offset]]
+        for neighbor in (offset - self.stride, offset + self.stride, offset - 1, offset + 1):
+            if not 0 <= neighbor < len(data):
                 continue
-            new_cost = node_to_process.distance_to_start + edge_cost
-            if edge_node in queue and edge_node.distance_to_start <= new_cost:
+            neighbor_height = BYTE_HEIGHTS[data[neighbor]]
+            if not neighbor_height:
                 continue
-            edge_node.distance_to_start = new_cost
-            if edge_node not in queue:
-                edge_node.predecessor = node_to_process
-                queue.append(edge_node)
-        node_to_process.processed = True
-
-
-input_lines = get_input()
-Node.register_map(input_lines)
-dijkstra(Node.map, Node.start_position)
-result1 = Node.map[*Node.end_position].distance_to_start
-print(f"Result 1 is {result1}")
-
-
-Node.clear_map()
-Node.register_map(input_lines)
-possible_positions: list[tuple[int, int]] = []
-for (x, y), node in Node.map.items():
-    if node.value == 1:
-        possible_positions.append((x, y))
-
-# Extremely ugly and slow, but I am too lazy right now to
-# reverse the whole graph logic.
-result2 = 99999999
-for i, position in enumerate(possible_positions):
-    Node.clear_map()
-    Node.register_map(input_lines)
-    dijkstra(Node.map, position)
-    result2 = min(result2, Node.map[*Node.end_position].distance_to_start)
-
-print(f"Result 2 is {result2}")
+            if (height - neighbor_height if reverse else neighbor_height - height) <= 1:
+                yield neighbor
+
+
+def mapped_bfs(
+    heightmap: MappedHeightMap,
+    start: int,
+    is_target: Callable[[int], bool],
+    reverse: bool = False,
+) -> int:
+    """Breadth-first search on a memory-mapped heightmap.
+
+    The search goes level by level, so besides the visited bitset, only
+    the current and the next frontier are held in memory.
+
+    Returns:
+        int: distance to the closest target, UNREACHABLE if there is none
+    """
+    visited = bytearray(len(heightmap.data) // 8 + 1)
+    visited[start >> 3] |= 1 << (start & 7)
+    frontier = array("q", [start])
+    distance = 0
+    while frontier:
+        next_frontier = array("q")
+        for offset in frontier:
+            if is_target(offset):
+                return distance
+            for neighbor in heightmap.neighbors(offset, reverse):
+                if not visited[neighbor >> 3] & (1 << (neighbor & 7)):
+                    visited[neighbor >> 3] |= 1 << (neighbor & 7)
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        distance += 1
+    return UNREACHABLE
+
+
+if "--mapped" in sys.argv[1:]:
+    with map_bytes() as data:
+        mapped = MappedHeightMap(data)
+        result1 = mapped_bfs(mapped, mapped.start, lambda offset: offset == mapped.end)
+        print(f"Result 1 is {result1}")
+        result2 = mapped_bfs(
+            mapped, mapped.end, lambda offset: BYTE_HEIGHTS[data[offset]] == 1, reverse=True
+        )
+        print(f"Result 2 is {result2}")
+else:
+    heightmap = HeightMap(cached_lines())
+    distances = bfs(heightmap, heightmap.start)
+    result1 = distances[heightmap.end]
+    print(f"Result 1 is {result1}")
+
+    # Searching backwards from the end gives the distance of every cell
+    # to the end in one go.
+    distances_to_end = bfs(heightmap, heightmap.end, reverse=True)
+    result2 = min(
+        distance for distance, height in zip(distances_to_end, heightmap.heights) if height == 1
+    )
+
+    print(f"Result 2 is {result2}")
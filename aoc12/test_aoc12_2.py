@@ -0,0 +1,62 @@
+from collections import deque
+import random
+
+from aoc12_2 import PAIR_BYTES, UNREACHABLE, HeightMap, PathQueries, letter_height
+
+
+def random_lines(rng: random.Random) -> list[str]:
+    width, height = rng.randint(2, 8), rng.randint(2, 8)
+    cells = [rng.choice("abcde") for _ in range(width * height)]
+    start, end = rng.sample(range(width * height), 2)
+    cells[start], cells[end] = "S", "E"
+    return ["".join(cells[y * width:(y + 1) * width]) for y in range(height)]
+
+
+def brute_force_distance(lines: list[str], source: tuple[int, int], target: tuple[int, int]) -> int:
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == target:
+            return distances[target]
+        for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if not (0 <= ny < len(lines) and 0 <= nx < len(lines[0])) or (nx, ny) in distances:
+                continue
+            if letter_height(lines[ny][nx]) - letter_height(lines[y][x]) <= 1:
+                distances[nx, ny] = distances[x, y] + 1
+                queue.append((nx, ny))
+    return UNREACHABLE
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(0)
+    for _ in range(30):
+        lines = random_lines(rng)
+        heightmap = HeightMap(lines)
+        queries = PathQueries(heightmap, max_bytes=rng.choice((PAIR_BYTES, 2000, 1 << 20)))
+        for _ in range(40):
+            source, target = rng.randrange(len(heightmap)), rng.randrange(len(heightmap))
+            expected = brute_force_distance(
+                lines, heightmap.position(source), heightmap.position(target)
+            )
+            assert queries.distance(source, target) == expected
+            assert queries.used_bytes <= max(queries.max_bytes, 8 * len(heightmap))
+
+
+def test_repeated_pair_is_answered_from_cache():
+    rng = random.Random(1)
+    queries = PathQueries(HeightMap(random_lines(rng)))
+    first = queries.distance(0, 3)
+    assert queries.distance(0, 3) == first
+    assert list(queries.cache) == [(0, 3)]
+    assert queries.used_bytes == PAIR_BYTES
+
+
+def test_field_replaces_pairs_of_its_source():
+    rng = random.Random(2)
+    queries = PathQueries(HeightMap(random_lines(rng)))
+    queries.distance(0, 3)
+    queries.distance(0, 1)
+    assert list(queries.cache) == [(0, None)]
+    assert queries.pair_targets == {}
+    assert queries.used_bytes == queries.cache[0, None].itemsize * len(queries.graph)
@@ -1,22 +1,25 @@
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Self
+import sys
 
 from flask import Flask
 import jinja2
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aoc_input import iter_lines
+
 J2ENV = jinja2.Environment(
     loader=jinja2.FileSystemLoader("templates"), autoescape=jinja2.select_autoescape()
 )
 
 
-def get_input(filename: str | None) -> list[str]:
+def get_input(filename: str | None) -> Iterator[str]:
     if filename is None:
         filename = "input.txt"
-    input_lines: list[str] = []
-    with open(filename, "r", encoding="utf-8") as file:
-        for line in file.readlines():
-            input_lines.append(line.strip())
-    return input_lines
+    return iter_lines(filename)
 
 
 @dataclass(eq=True, frozen=True)
@@ -32,25 +35,46 @@ class Position:
 
 
 NEW_GRAIN_POSITION = Position(500, 0)
+# Byte values of the cells mapped to their latin-1 symbols: ".", "#" and "°"
+SYMBOLS = bytes.maketrans(b"\x00\x01\x02", b".#\xb0")
 
 
 class Cave:
+    """Cave stored as a dense grid of bytes, one row after the other.
+
+    The grid covers everything a grain can reach: all rows down to the
+    floor and every column the sand pile can spread to from the new grain
+    position. Below the floor, every cell counts as rock.
+    """
+
     def __init__(self, min_pos: Position, max_pos: Position) -> None:
         self.min_pos = min_pos
         self.max_pos = max_pos
-        self.positions: dict[Position, int] = {}
-        self.current_grain: Position = NEW_GRAIN_POSITION
+        self.height = max_pos.y + 2
+        self.offset_x = min(min_pos.x, NEW_GRAIN_POSITION.x - self.height)
+        self.width = max(max_pos.x, NEW_GRAIN_POSITION.x + self.height) - self.offset_x + 1
+        self.cells = bytearray(self.width * self.height)
+        # Bounding box of all cells that have ever been filled
+        self.bounds_min_x = NEW_GRAIN_POSITION.x
+        self.bounds_max_x = NEW_GRAIN_POSITION.x
+        self.bounds_max_y = NEW_GRAIN_POSITION.y
+        self.grain_x: int = NEW_GRAIN_POSITION.x
+        self.grain_y: int = NEW_GRAIN_POSITION.y
         self.update_counter: int = 0
         self.number_of_grains: int = 1
         self.set(self.current_grain, 2)
 
+    @property
+    def current_grain(self) -> Position:
+        return Position(self.grain_x, self.grain_y)
+
     @property
     def min_x(self) -> int:
-        return min(pos.x for pos in self.positions.keys())
+        return self.bounds_min_x
 
     @property
     def max_x(self) -> int:
-        return max(pos.x for pos in self.positions.keys())
+        return self.bounds_max_x
 
     @property
     def min_y(self) -> int:
@@ -58,44 +82,73 @@ class Cave:
 
     @property
     def max_y(self) -> int:
-        return max(pos.y for pos in self.positions.keys())
+        return self.bounds_max_y
 
-    def get(self, pos: Position) -> int:
-        if pos.y > self.max_pos.y + 1:
+    def extend_bounds(self, min_x: int, max_x: int, max_y: int):
+        self.bounds_min_x = min(self.bounds_min_x, min_x)
+        self.bounds_max_x = max(self.bounds_max_x, max_x)
+        self.bounds_max_y = max(self.bounds_max_y, max_y)
+
+    def index(self, x: int, y: int) -> int:
+        column = x - self.offset_x
+        if not (0 <= column < self.width and 0 <= y < self.height):
+            raise IndexError(f"Position ({x}, {y}) is outside of the cave")
+        return y * self.width + column
+
+    def get_xy(self, x: int, y: int) -> int:
+        if y > self.max_pos.y + 1:
             return 1
-        if not pos in self.positions:
-            return 0
-        return self.positions[pos]
+        return self.cells[self.index(x, y)]
+
+    def set_xy(self, x: int, y: int, value: int):
+        self.cells[self.index(x, y)] = value
+        if value:
+            if x < self.bounds_min_x:
+                self.bounds_min_x = x
+            elif x > self.bounds_max_x:
+                self.bounds_max_x = x
+            if y > self.bounds_max_y:
+                self.bounds_max_y = y
+
+    def get(self, pos: Position) -> int:
+        return self.get_xy(pos.x, pos.y)
 
     def set(self, pos: Position, value: int):
-        self.positions[pos] = value
+        self.set_xy(pos.x, pos.y, value)
 
     def draw_rock(self, edges: list[Position]):
         for edge in edges:
-            self.set(edge, 1)
+            self.cells[self.index(edge.x, edge.y)] = 1
         for i in range(len(edges) - 1):
             edge1 = edges[i]
             edge2 = edges[i + 1]
             if edge1.x == edge2.x:
-                for y in range(min(edge1.y, edge2.y), max(edge1.y, edge2.y)):
-                    self.set(Position(edge1.x, y), 1)
+                start = self.index(edge1.x, min(edge1.y, edge2.y))
+                end = self.index(edge1.x, max(edge1.y, edge2.y))
+                self.cells[start:end:self.width] = b"\x01" * ((end - start) // self.width)
             if edge1.y == edge2.y:
-                for x in range(min(edge1.x, edge2.x), max(edge1.x, edge2.x)):
-                    self.set(Position(x, edge1.y), 1)
-
-    def paint(self):
-        """Creates a matrix of Characters for the HTML output"""
-        symbols = {
-            0: ".",
-            1: "#",
-            2: "°",
-        }
+                start = self.index(min(edge1.x, edge2.x), edge1.y)
+                end = self.index(max(edge1.x, edge2.x), edge1.y)
+                self.cells[start:end] = b"\x01" * (end - start)
+        if edges:
+            self.extend_bounds(
+                min(edge.x for edge in edges),
+                max(edge.x for edge in edges),
+                max(edge.y for edge in edges),
+            )
+
+    def paint(self) -> list[str]:
+        """Creates the rows of Characters for the HTML output.
+
+        Every row is cut from the grid and translated in one go, so this
+        only costs the number of visible cells.
+        """
+        start = self.min_x - self.offset_x
+        end = self.max_x - self.offset_x + 1
         output = []
         for y in range(self.min_y, self.max_y + 1):
-            line = []
-            for x in range(self.min_x, self.max_x + 1):
-                line.append(symbols[self.get(Position(x, y))])
-            output.append(line)
+            row = self.cells[y * self.width + start:y * self.width + end]
+            output.append(row.translate(SYMBOLS).decode("latin-1"))
         return output
 
     def move_grain(self) -> bool:
@@ -104,22 +157,18 @@ class Cave:
         If it has been moved, return True,
         If no space free in these positions, return False
         """
-
-        below = Position(x=self.current_grain.x, y=self.current_grain.y + 1)
-        bottom_left = Position(x=self.current_grain.x - 1, y=self.current_grain.y + 1)
-        bottom_right = Position(x=self.current_grain.x + 1, y=self.current_grain.y + 1)
-        target: Position
-        if self.get(below) == 0:
-            target = below
-        elif self.get(bottom_left) == 0:
-            target = bottom_left
-        elif self.get(bottom_right) == 0:
-            target = bottom_right
+        x, y = self.grain_x, self.grain_y
+        if self.get_xy(x, y + 1) == 0:
+            target_x = x
+        elif self.get_xy(x - 1, y + 1) == 0:
+            target_x = x - 1
+        elif self.get_xy(x + 1, y + 1) == 0:
+            target_x = x + 1
         else:
             return False
-        self.set(self.current_grain, 0)
-        self.current_grain = target
-        self.set(target, 2)
+        self.set_xy(x, y, 0)
+        self.grain_x, self.grain_y = target_x, y + 1
+        self.set_xy(target_x, y + 1, 2)
         return True
 
     def new_grain(self) -> bool:
@@ -133,7 +182,7 @@ class Cave:
             return False
         self.number_of_grains += 1
         self.set(NEW_GRAIN_POSITION, 2)
-        self.current_grain = NEW_GRAIN_POSITION
+        self.grain_x, self.grain_y = NEW_GRAIN_POSITION.x, NEW_GRAIN_POSITION.y
         return True
 
     def update(self) -> bool:
@@ -146,7 +195,7 @@ class Cave:
         return True
 
 
-def parse_input(input_lines: list[str]) -> list[list[Position]]:
+def parse_input(input_lines: Iterable[str]) -> list[list[Position]]:
     output = []
     for line in input_lines:
         tuple_strings = line.split("->")
@@ -181,7 +230,7 @@ if __name__ == "__main__":
         updated = cave.update()
         if cave.update_counter % 100 == 0:
             print(f"grain {cave.number_of_grains} at iteration {cave.update_counter}")
-        if cave.current_grain.y > cave.max_pos.y:
+        if cave.grain_y > cave.max_pos.y:
             print(
                 f"The first grain to fall through is number {cave.number_of_grains} at iteration {cave.update_counter}."
             )
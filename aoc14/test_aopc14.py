@@ -46,3 +46,35 @@ def test_draw_matrix():
         cave.draw_rock(line)
     pic = cave.paint()
     assert pic == TEST_PIC
+
+
+def test_sand_comes_to_rest():
+    input_lines = get_input("test_input.txt")
+    parsed_input = parse_input(input_lines)
+    min_pos, max_pos = get_dimensions(parsed_input)
+    cave = Cave(min_pos, max_pos)
+    for line in parsed_input:
+        cave.draw_rock(line)
+    while cave.grain_y <= cave.max_pos.y:
+        cave.update()
+    assert cave.number_of_grains == 25
+    while cave.update():
+        pass
+    assert cave.number_of_grains == 93
+    assert cave.get(Position(500, 0)) == 2
+
+
+def test_paint_tracks_bounds():
+    input_lines = get_input("test_input.txt")
+    parsed_input = parse_input(input_lines)
+    min_pos, max_pos = get_dimensions(parsed_input)
+    cave = Cave(min_pos, max_pos)
+    for line in parsed_input:
+        cave.draw_rock(line)
+    assert (cave.min_x, cave.max_x, cave.max_y) == (494, 503, 9)
+    pic = cave.paint()
+    assert pic[0] == "......°..."
+    assert pic[9] == "#########."
+    while cave.update():
+        pass
+    assert (cave.min_x, cave.max_x, cave.max_y) == (490, 510, 10)
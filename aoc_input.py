@@ -0,0 +1,86 @@
+"""Shared input handling for the daily puzzles.
+
+Every day reads its puzzle input from a text file in its own directory.
+Instead of loading the whole file into a list of lines, the helpers in
+here hand out lazy iterators, a memory-mapped bytes view or a cached
+copy of the text that is read and decoded only once per file.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cache
+import mmap
+
+
+DEFAULT_FILENAME = "input.txt"
+
+
+def iter_lines(filename: str = DEFAULT_FILENAME) -> Iterator[str]:
+    """Lazily yields the stripped lines of a file, one line at a time.
+
+    Args:
+        filename (str): path of the input file
+
+    Yields:
+        str: the next line without surrounding whitespace
+    """
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+            yield line.strip()
+
+
+@cache
+def read_text(filename: str = DEFAULT_FILENAME) -> str:
+    """Reads and decodes a file once, later calls return the cached text.
+
+    Args:
+        filename (str): path of the input file
+
+    Returns:
+        str: the whole content of the file
+    """
+    with open(filename, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def cached_lines(filename: str = DEFAULT_FILENAME) -> Iterator[str]:
+    """Yields the stripped lines of the cached text of a file.
+
+    Use this instead of iter_lines when a day walks over its input more
+    than once, so the file is only read from disk a single time.
+
+    Args:
+        filename (str): path of the input file
+
+    Yields:
+        str: the next line without surrounding whitespace
+    """
+    text = read_text(filename)
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end].strip()
+        start = end + 1
+
+
+@contextmanager
+def map_bytes(filename: str = DEFAULT_FILENAME) -> Iterator[mmap.mmap | bytes]:
+    """Memory-maps a file read-only and provides its raw bytes.
+
+    Empty files cannot be mapped, those are provided as empty bytes.
+
+    Args:
+        filename (str): path of the input file
+
+    Yields:
+        mmap.mmap | bytes: the content of the file
+    """
+    with open(filename, "rb") as file:
+        try:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        with view:
+            yield view